@@ -0,0 +1,725 @@
+"""
+============================================
+PROJECT 3: SNAKE GAME - MULTIPLAYER SERVER
+============================================
+Authoritative multiplayer server for the Snake game, built with asyncio
+
+FEATURES:
+- Many snakes per room, many rooms per process
+- Same rules as project3-snake-game.py (wrap-around board,
+  no 180-degree turns, grow by one and +10 score per food)
+- Fixed tick rate, the server owns all game state
+- Clients connect over local TCP or UDP
+- Per-tick delta snapshots (head added, tail removed, food changes)
+  instead of sending the whole board every tick
+- Headless load generator that measures tick jitter and bandwidth
+
+HOW TO RUN:
+1. No extra libraries needed (standard library only)
+
+2. Start the server (TCP on 8765, UDP on 8766):
+   python project3-snake-server.py serve
+
+3. In another terminal, run the load generator:
+   python project3-snake-server.py loadgen --players 200 --rooms 2
+   python project3-snake-server.py loadgen --transport udp
+
+PROTOCOL:
+Every message is one compact JSON object. Over TCP messages end
+with a newline, over UDP each datagram holds one message.
+Cells are numbered y * width + x.
+
+Client -> server:
+- {"op": "join", "room": "lobby"}   join a room and spawn a snake
+- {"op": "turn", "d": "U"}          turn (U, D, L or R)
+- {"op": "spawn"}                   respawn after dying
+- {"op": "sync"}                    ask for a full snapshot
+- {"op": "ping"}                    keep a UDP session alive
+- {"op": "leave"}                   leave the room
+
+Server -> client:
+- {"op": "welcome", "id", "room", "w", "h", "hz"}
+- {"op": "s", "t", "s": [[id, [cells, head first]], ...], "f": [cells]}
+- {"op": "d", "t", "n": [[id, cell]], "k": [ids], "m": [[id, cell, r]],
+   "f+": [cells], "f-": [cells]}
+  Apply in order: n (new snakes, replacing any with the same id),
+  k (killed snakes), m (new head, tail removed when r is 1), then
+  the food changes. A snake spawned and removed before the tick
+  (it died on that tick, or its player left) appears in both n
+  and k. Empty fields are left out. A snake's score is
+  10 * (length - 1).
+============================================
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, deque
+
+# ========== GAME SETTINGS ==========
+# Same board and speed as project3-snake-game.py, counted in cells
+GRID_WIDTH = 800 // 20
+GRID_HEIGHT = 600 // 20
+TICK_RATE = 10
+SNAKES_PER_FOOD = 4
+MAX_SNAKES_PER_ROOM = 500
+
+# ========== NETWORK SETTINGS ==========
+HOST = '127.0.0.1'
+TCP_PORT = 8765
+UDP_PORT = 8766
+SESSION_TIMEOUT = 10.0  # Drop UDP clients that go quiet (seconds)
+MAX_WRITE_BUFFER = 64 * 1024  # TCP clients this far behind get resynced
+STATS_INTERVAL = 5.0
+
+# ========== DIRECTIONS ==========
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = {'U': UP, 'D': DOWN, 'L': LEFT, 'R': RIGHT}
+
+
+def encode(message):
+    """Encode a message as compact JSON bytes"""
+    return json.dumps(message, separators=(',', ':')).encode()
+
+
+def percentile(values, fraction):
+    """Get a percentile from a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ServerSnake:
+    """One player's snake, following the rules of Snake in the game"""
+
+    def __init__(self, snake_id, cell):
+        """Initialize the snake on a single cell"""
+        self.id = snake_id
+        self.length = 1
+        self.body = deque([cell])
+        self.direction = random.choice([UP, DOWN, LEFT, RIGHT])
+
+    def turn(self, point):
+        """Change snake direction"""
+        if self.length > 1 and (point[0] * -1, point[1] * -1) == self.direction:
+            return  # Prevent 180-degree turns
+        self.direction = point
+
+    def next_cell(self, width, height):
+        """Get the cell the head moves into, wrapping around the board"""
+        head = self.body[0]
+        x, y = self.direction
+        return ((head // width + y) % height) * width + (head % width + x) % width
+
+
+class Room:
+    """One board shared by many snakes, ticked by its own task"""
+
+    def __init__(self, name, width, height, tick_rate):
+        """Initialize an empty room"""
+        self.name = name
+        self.width = width
+        self.height = height
+        self.tick_rate = tick_rate
+        self.sessions = {}
+        self.snakes = {}
+        self.occupied = bytearray(width * height)
+        self.food = set()
+        self.tick = 0
+        self.spawned = []
+        self.removed = []
+        self.task = None
+
+        # Stats
+        self.busy_time = 0.0
+        self.late_ticks = 0
+        self.bytes_sent = 0
+
+    def random_free_cell(self):
+        """Find a random cell with no snake or food on it"""
+        for _ in range(100):
+            cell = random.randrange(len(self.occupied))
+            if not self.occupied[cell] and cell not in self.food:
+                return cell
+        free = [cell for cell, used in enumerate(self.occupied)
+                if not used and cell not in self.food]
+        return random.choice(free) if free else None
+
+    def spawn(self, snake_id):
+        """Put a new snake for a player on the board"""
+        if snake_id in self.snakes:
+            return True
+        cell = self.random_free_cell()
+        if cell is None:
+            return False
+        self.snakes[snake_id] = ServerSnake(snake_id, cell)
+        self.occupied[cell] = 1
+        self.spawned.append([snake_id, cell])
+        if snake_id in self.removed:
+            # Left and came back before the tick: clients only need the spawn
+            self.removed.remove(snake_id)
+        return True
+
+    def kill(self, snake_id):
+        """Take a snake off the board"""
+        snake = self.snakes.pop(snake_id, None)
+        if snake is not None:
+            for cell in snake.body:
+                self.occupied[cell] = 0
+            self.removed.append(snake_id)
+
+    def step(self):
+        """Run one tick of the game rules and return its delta"""
+        self.tick += 1
+        delta = {'op': 'd', 't': self.tick}
+
+        # Snakes die when they run into any body, or into each other head-on
+        targets = {snake_id: snake.next_cell(self.width, self.height)
+                   for snake_id, snake in self.snakes.items()}
+        heads = Counter(targets.values())
+        crashed = [snake_id for snake_id, cell in targets.items()
+                   if self.occupied[cell] or heads[cell] > 1]
+        for snake_id in crashed:
+            self.kill(snake_id)
+
+        # Move the survivors
+        moves = []
+        for snake in self.snakes.values():
+            cell = targets[snake.id]
+            snake.body.appendleft(cell)
+            self.occupied[cell] = 1
+            removed = 0
+            if len(snake.body) > snake.length:
+                self.occupied[snake.body.pop()] = 0
+                removed = 1
+            moves.append([snake.id, cell, removed])
+
+        # Check if snakes eat food
+        eaten = []
+        for snake in self.snakes.values():
+            if snake.body[0] in self.food:
+                snake.length += 1
+                self.food.remove(snake.body[0])
+                eaten.append(snake.body[0])
+
+        # Keep enough food on the board for everyone
+        added = []
+        wanted = max(1, len(self.snakes) // SNAKES_PER_FOOD)
+        while len(self.food) < wanted:
+            cell = self.random_free_cell()
+            if cell is None:
+                break
+            self.food.add(cell)
+            added.append(cell)
+
+        for key, value in (('n', self.spawned), ('k', self.removed),
+                           ('m', moves), ('f+', added), ('f-', eaten)):
+            if value:
+                delta[key] = value
+        self.spawned = []
+        self.removed = []
+        return delta
+
+    def snapshot(self):
+        """Get the full room state"""
+        return {'op': 's', 't': self.tick,
+                's': [[snake.id, list(snake.body)]
+                      for snake in self.snakes.values()],
+                'f': list(self.food)}
+
+    def broadcast(self, delta):
+        """Send the tick's delta, or a snapshot to clients that need one"""
+        data = encode(delta)
+        snapshot = None
+        for session in self.sessions.values():
+            if session.backlogged():
+                session.needs_sync = True
+                continue
+            if session.needs_sync:
+                if snapshot is None:
+                    snapshot = encode(self.snapshot())
+                self.bytes_sent += session.send(snapshot)
+                session.needs_sync = False
+            else:
+                self.bytes_sent += session.send(data)
+
+    async def run(self):
+        """Tick the room at a fixed rate until it is cancelled"""
+        loop = asyncio.get_running_loop()
+        period = 1 / self.tick_rate
+        deadline = loop.time()
+        while True:
+            deadline += period
+            started = time.perf_counter()
+            self.broadcast(self.step())
+            self.busy_time += time.perf_counter() - started
+
+            delay = deadline - loop.time()
+            if delay < 0:
+                # Running behind: skip the missed ticks instead of bursting
+                self.late_ticks += 1
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+
+class Session:
+    """A connected client"""
+
+    def __init__(self, session_id):
+        """Initialize the session"""
+        self.id = session_id
+        self.room = None
+        self.needs_sync = True
+        self.last_seen = time.monotonic()
+
+    def backlogged(self):
+        """Check if the client is too far behind to send to"""
+        return False
+
+
+class TcpSession(Session):
+    """A client connected over TCP"""
+
+    def __init__(self, session_id, writer):
+        super().__init__(session_id)
+        self.writer = writer
+
+    def send(self, data):
+        """Send one message and return the number of bytes sent"""
+        if self.writer.is_closing():
+            return 0
+        self.writer.write(data + b'\n')
+        return len(data) + 1
+
+    def backlogged(self):
+        return self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER
+
+
+class UdpSession(Session):
+    """A client talking to us over UDP"""
+
+    def __init__(self, session_id, transport, addr):
+        super().__init__(session_id)
+        self.transport = transport
+        self.addr = addr
+
+    def send(self, data):
+        """Send one message and return the number of bytes sent"""
+        self.transport.sendto(data, self.addr)
+        return len(data)
+
+
+class UdpServerProtocol(asyncio.DatagramProtocol):
+    """Turn UDP datagrams into sessions and messages"""
+
+    def __init__(self, server):
+        self.server = server
+        self.sessions = {}
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if not isinstance(message, dict):
+            return
+        session = self.sessions.get(addr)
+        if session is None:
+            if message.get('op') != 'join':
+                return
+            session = UdpSession(self.server.new_id(), self.transport, addr)
+            self.sessions[addr] = session
+        session.last_seen = time.monotonic()
+        self.server.handle(session, message)
+        if session.room is None:
+            del self.sessions[addr]
+
+    def drop_idle(self):
+        """Remove sessions we have not heard from in a while"""
+        cutoff = time.monotonic() - SESSION_TIMEOUT
+        for addr, session in list(self.sessions.items()):
+            if session.last_seen < cutoff:
+                self.server.leave(session)
+                del self.sessions[addr]
+
+
+class SnakeServer:
+    """Owns the rooms and routes client messages to them"""
+
+    def __init__(self, width, height, tick_rate, max_snakes):
+        """Initialize the server"""
+        self.width = width
+        self.height = height
+        self.tick_rate = tick_rate
+        self.max_snakes = max_snakes
+        self.rooms = {}
+        self.last_id = 0
+
+        # Stats from rooms closed since the last report
+        self.busy_time = 0.0
+        self.late_ticks = 0
+        self.bytes_sent = 0
+
+    def new_id(self):
+        """Get a new session id"""
+        self.last_id += 1
+        return self.last_id
+
+    def join(self, session, name):
+        """Add a session to a room, creating the room if needed"""
+        room = self.rooms.get(name)
+        if room is None:
+            room = Room(name, self.width, self.height, self.tick_rate)
+            room.task = asyncio.get_running_loop().create_task(room.run())
+            self.rooms[name] = room
+        if len(room.sessions) >= self.max_snakes:
+            session.send(encode({'op': 'error', 'msg': 'room full'}))
+            self.close_if_empty(room)
+            return
+        session.room = room
+        session.needs_sync = True
+        room.sessions[session.id] = session
+        room.spawn(session.id)
+        session.send(encode({'op': 'welcome', 'id': session.id,
+                             'room': name, 'w': room.width,
+                             'h': room.height, 'hz': room.tick_rate}))
+
+    def leave(self, session):
+        """Remove a session from its room"""
+        room = session.room
+        if room is None:
+            return
+        session.room = None
+        room.sessions.pop(session.id, None)
+        room.kill(session.id)
+        self.close_if_empty(room)
+
+    def close_if_empty(self, room):
+        """Stop ticking a room nobody is in"""
+        if not room.sessions:
+            room.task.cancel()
+            del self.rooms[room.name]
+            self.busy_time += room.busy_time
+            self.late_ticks += room.late_ticks
+            self.bytes_sent += room.bytes_sent
+
+    def handle(self, session, message):
+        """Handle one message from a client"""
+        op = message.get('op')
+        if not isinstance(op, str):
+            return
+        if op == 'join':
+            self.leave(session)
+            self.join(session, str(message.get('room', 'lobby')))
+            return
+
+        room = session.room
+        if room is None:
+            return
+        if op == 'turn':
+            snake = room.snakes.get(session.id)
+            direction = message.get('d')
+            if isinstance(direction, str):
+                direction = DIRECTIONS.get(direction)
+            else:
+                direction = None
+            if snake is not None and direction is not None:
+                snake.turn(direction)
+        elif op == 'spawn':
+            if not room.spawn(session.id):
+                session.send(encode({'op': 'error', 'msg': 'room full'}))
+        elif op == 'sync':
+            session.needs_sync = True
+        elif op == 'leave':
+            self.leave(session)
+
+    async def handle_tcp(self, reader, writer):
+        """Serve one TCP client until it disconnects"""
+        session = TcpSession(self.new_id(), writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict):
+                    self.handle(session, message)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.leave(session)
+            writer.close()
+
+    async def report(self, udp):
+        """Print server stats and drop idle UDP clients"""
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            if udp is not None:
+                udp.drop_idle()
+            now = time.perf_counter()
+            elapsed = now - last
+            last = now
+
+            rooms = list(self.rooms.values())
+            players = sum(len(room.sessions) for room in rooms)
+            busy = self.busy_time + sum(room.busy_time for room in rooms)
+            late = self.late_ticks + sum(room.late_ticks for room in rooms)
+            sent = self.bytes_sent + sum(room.bytes_sent for room in rooms)
+            for counted in rooms + [self]:
+                counted.busy_time = 0.0
+                counted.late_ticks = 0
+                counted.bytes_sent = 0
+            print(f'rooms: {len(rooms)}  players: {players}  '
+                  f'cpu: {busy / elapsed:.0%}  late ticks: {late}  '
+                  f'out: {sent / elapsed / 1024:.1f} KB/s')
+
+
+async def serve(args):
+    """Run the server"""
+    server = SnakeServer(args.width, args.height, args.tick_rate,
+                         args.max_snakes)
+    loop = asyncio.get_running_loop()
+
+    tcp = await asyncio.start_server(server.handle_tcp, args.host, args.tcp)
+    _, udp = await loop.create_datagram_endpoint(
+        lambda: UdpServerProtocol(server), local_addr=(args.host, args.udp))
+    print(f'Snake server on {args.host}  tcp: {args.tcp}  udp: {args.udp}  '
+          f'board: {args.width}x{args.height}  {args.tick_rate} ticks/s')
+
+    async with tcp:
+        await server.report(udp)
+
+
+# ========== LOAD GENERATOR ==========
+class Bot:
+    """A headless player that mirrors the board from snapshots and deltas"""
+
+    def __init__(self, room, turn_chance):
+        """Initialize the bot"""
+        self.room = room
+        self.turn_chance = turn_chance
+        self.id = None
+        self.tick_rate = None
+        self.tick = None
+        self.snakes = {}
+        self.food = set()
+
+        # Stats
+        self.arrivals = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.resyncs = 0
+        self.deaths = 0
+
+    def resync(self):
+        """Throw away the mirror and ask for a snapshot"""
+        self.tick = None
+        self.resyncs += 1
+        return [{'op': 'sync'}]
+
+    def on_message(self, message, now):
+        """Apply one server message and return the replies to send"""
+        op = message.get('op')
+        if op == 'welcome':
+            self.id = message['id']
+            self.tick_rate = message['hz']
+            return []
+        if op == 's':
+            self.arrivals.append(now)
+            self.tick = message['t']
+            self.snakes = {snake_id: deque(body)
+                           for snake_id, body in message['s']}
+            self.food = set(message['f'])
+            return []
+        if op != 'd':
+            return []
+
+        self.arrivals.append(now)
+        if self.tick is None:
+            return []  # Still waiting for a snapshot
+        if message['t'] != self.tick + 1:
+            return self.resync()
+        self.tick = message['t']
+
+        replies = []
+        for snake_id, cell in message.get('n', []):
+            self.snakes[snake_id] = deque([cell])
+        for snake_id in message.get('k', []):
+            self.snakes.pop(snake_id, None)
+            if snake_id == self.id:
+                self.deaths += 1
+                replies.append({'op': 'spawn'})
+        for snake_id, cell, removed in message.get('m', []):
+            body = self.snakes.get(snake_id)
+            if body is None:
+                return self.resync()
+            body.appendleft(cell)
+            if removed:
+                body.pop()
+        self.food.difference_update(message.get('f-', []))
+        self.food.update(message.get('f+', []))
+
+        if self.id in self.snakes and random.random() < self.turn_chance:
+            replies.append({'op': 'turn', 'd': random.choice('UDLR')})
+        return replies
+
+
+async def run_tcp_bot(bot, args, deadline):
+    """Play one bot over TCP until the deadline"""
+    loop = asyncio.get_running_loop()
+    reader, writer = await asyncio.open_connection(args.host, args.tcp,
+                                                   limit=1 << 22)
+
+    def send(message):
+        data = encode(message) + b'\n'
+        bot.bytes_out += len(data)
+        writer.write(data)
+
+    send({'op': 'join', 'room': bot.room})
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                line = await asyncio.wait_for(reader.readline(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if not line:
+                break
+            bot.bytes_in += len(line)
+            for reply in bot.on_message(json.loads(line), time.perf_counter()):
+                send(reply)
+    finally:
+        writer.close()
+
+
+class UdpBotProtocol(asyncio.DatagramProtocol):
+    """Feed UDP datagrams to a bot"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.bot.bytes_in += len(data)
+        for reply in self.bot.on_message(json.loads(data), time.perf_counter()):
+            self.send(reply)
+
+    def send(self, message):
+        data = encode(message)
+        self.bot.bytes_out += len(data)
+        self.transport.sendto(data)
+
+
+async def run_udp_bot(bot, args, deadline):
+    """Play one bot over UDP until the deadline"""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: UdpBotProtocol(bot), remote_addr=(args.host, args.udp))
+    protocol.send({'op': 'join', 'room': bot.room})
+    try:
+        while loop.time() < deadline:
+            await asyncio.sleep(min(1.0, max(0, deadline - loop.time())))
+            protocol.send({'op': 'ping'})
+        protocol.send({'op': 'leave'})
+    finally:
+        transport.close()
+
+
+async def loadgen(args):
+    """Run many bots against a server and report jitter and bandwidth"""
+    loop = asyncio.get_running_loop()
+    bots = [Bot(f'room-{i % args.rooms}', args.turn_chance)
+            for i in range(args.players)]
+    run_bot = run_udp_bot if args.transport == 'udp' else run_tcp_bot
+    deadline = loop.time() + args.seconds
+    try:
+        await asyncio.gather(*(run_bot(bot, args, deadline) for bot in bots))
+    except OSError:
+        bots = []
+
+    # UDP can't tell a dead port apart, so no welcome means no server
+    tick_rate = next((bot.tick_rate for bot in bots if bot.tick_rate), None)
+    if tick_rate is None:
+        print(f'Snake server not reachable on {args.host}')
+        return
+
+    # Tick jitter: how far each gap between ticks is from the server's period
+    jitter = []
+    for bot in bots:
+        if bot.tick_rate is None:
+            continue
+        period = 1 / bot.tick_rate
+        jitter.extend(abs(later - earlier - period) * 1000
+                      for earlier, later in zip(bot.arrivals, bot.arrivals[1:]))
+    down = [bot.bytes_in / args.seconds for bot in bots]
+    up = [bot.bytes_out / args.seconds for bot in bots]
+    ticks = [len(bot.arrivals) for bot in bots]
+
+    print(f'players: {args.players}  rooms: {args.rooms}  '
+          f'transport: {args.transport}  seconds: {args.seconds}')
+    print(f'ticks per player:   {sum(ticks) / len(ticks):.1f} '
+          f'(expected {args.seconds * tick_rate:.0f})')
+    print(f'tick jitter (ms):   mean {sum(jitter) / max(1, len(jitter)):.2f}  '
+          f'p50 {percentile(jitter, 0.5):.2f}  '
+          f'p99 {percentile(jitter, 0.99):.2f}  '
+          f'max {max(jitter, default=0):.2f}')
+    print(f'down per player:    mean {sum(down) / len(down):.0f} B/s  '
+          f'max {max(down):.0f} B/s')
+    print(f'up per player:      mean {sum(up) / len(up):.0f} B/s')
+    print(f'resyncs: {sum(bot.resyncs for bot in bots)}  '
+          f'deaths: {sum(bot.deaths for bot in bots)}')
+
+
+def main():
+    """Parse the command line and run the server or load generator"""
+    parser = argparse.ArgumentParser(description='Multiplayer Snake server')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--tcp', type=int, default=TCP_PORT)
+    parser.add_argument('--udp', type=int, default=UDP_PORT)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='run the server')
+    serve_parser.add_argument('--width', type=int, default=GRID_WIDTH)
+    serve_parser.add_argument('--height', type=int, default=GRID_HEIGHT)
+    serve_parser.add_argument('--tick-rate', type=int, default=TICK_RATE)
+    serve_parser.add_argument('--max-snakes', type=int,
+                              default=MAX_SNAKES_PER_ROOM)
+
+    load_parser = commands.add_parser('loadgen', help='run headless bots')
+    load_parser.add_argument('--players', type=int, default=100)
+    load_parser.add_argument('--rooms', type=int, default=1)
+    load_parser.add_argument('--seconds', type=float, default=10.0)
+    load_parser.add_argument('--transport', choices=['tcp', 'udp'],
+                             default='tcp')
+    load_parser.add_argument('--turn-chance', type=float, default=0.2)
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args) if args.command == 'serve' else loadgen(args))
+    except KeyboardInterrupt:
+        pass
+
+
+# ========== RUN SERVER ==========
+if __name__ == '__main__':
+    main()
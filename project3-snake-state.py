@@ -0,0 +1,405 @@
+"""
+============================================
+PROJECT 3: SNAKE GAME - COMPACT GAME STATE
+============================================
+Small, fast-to-copy Snake game state for search agents (MCTS, beam search)
+
+FEATURES:
+- Same rules as Snake.move and main() in project3-snake-game.py
+- Body stored as a ring buffer of cell numbers in an array
+- Occupancy bitset, so collision checks are a single bit test
+- O(1) clone with copy-on-write of the body buffer
+- Undo / redo of a step
+- Incremental Zobrist hash for transposition tables
+
+HOW TO RUN:
+1. No extra libraries needed (standard library only)
+
+2. Run the benchmark:
+   python project3-snake-state.py
+
+USING IT:
+   state = GameState()
+   child = state.clone()          # cheap, shares the body until it moves
+   alive = child.step(UP)
+   child.undo()
+   child.redo()
+   table[child] = value           # hashable, compares by game state
+
+Cells are numbered y * GRID_WIDTH + x. Don't change a state while it
+is a key in a dict or set - clone it first.
+============================================
+"""
+
+import random
+import sys
+import time
+from array import array
+
+# ========== GAME SETTINGS ==========
+# Same board as project3-snake-game.py
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+GRID_SIZE = 20
+GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
+GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
+CELLS = GRID_WIDTH * GRID_HEIGHT
+MIN_CAPACITY = 4  # Ring buffer size for a new snake, always a power of 2
+NO_FOOD = CELLS  # Food value when the board is full
+
+# ========== DIRECTIONS ==========
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+# ========== ZOBRIST KEYS ==========
+# Fixed seed so hashes are the same on every run
+_keys = random.Random(2024)
+BODY_KEYS = tuple(_keys.getrandbits(64) for _ in range(CELLS))
+HEAD_KEYS = tuple(_keys.getrandbits(64) for _ in range(CELLS))
+FOOD_KEYS = tuple(_keys.getrandbits(64) for _ in range(CELLS + 1))
+DIRECTION_KEYS = tuple(_keys.getrandbits(64) for _ in DIRECTIONS)
+del _keys
+
+
+def move_cell(cell, direction):
+    """Get the next cell in a direction, wrapping around the board"""
+    x, y = direction
+    return (((cell // GRID_WIDTH + y) % GRID_HEIGHT) * GRID_WIDTH
+            + (cell % GRID_WIDTH + x) % GRID_WIDTH)
+
+
+class GameState:
+    """One snake and one food, packed for cheap copies"""
+
+    __slots__ = ('body', 'head', 'size', 'length', 'occupied', 'food',
+                 'direction', 'alive', 'key', '_owned', '_undo', '_redo')
+
+    def __init__(self, head=None, direction=None, food=None):
+        """Start a new game, like Snake() and Food() do"""
+        if head is None:
+            head = (GRID_HEIGHT // 2) * GRID_WIDTH + GRID_WIDTH // 2
+        if direction is None:
+            direction = random.choice(DIRECTIONS)
+
+        self.body = array('H', [head]) * MIN_CAPACITY
+        self.head = 0  # Slot of the head in the ring buffer
+        self.size = 1  # Cells currently in the body
+        self.length = 1  # Cells the body grows to, like Snake.length
+        self.occupied = 1 << head
+        self.direction = DIRECTIONS.index(direction)
+        self.food = self.random_free_cell() if food is None else food
+        self.alive = True
+        self.key = (BODY_KEYS[head] ^ HEAD_KEYS[head]
+                    ^ FOOD_KEYS[self.food] ^ DIRECTION_KEYS[self.direction])
+        self._owned = True
+        self._undo = None
+        self._redo = None
+
+    @classmethod
+    def from_game(cls, snake, food):
+        """Build a state from the game's Snake and Food objects"""
+        cells = [(y // GRID_SIZE) * GRID_WIDTH + x // GRID_SIZE
+                 for x, y in snake.positions]
+        x, y = food.position
+        state = cls(cells[-1], snake.direction,
+                    (y // GRID_SIZE) * GRID_WIDTH + x // GRID_SIZE)
+        for cell in reversed(cells[:-1]):
+            state._push(cell)
+        state.key ^= HEAD_KEYS[cells[-1]] ^ HEAD_KEYS[cells[0]]
+        state.length = snake.length
+        return state
+
+    @property
+    def score(self):
+        """Score, 10 points per food eaten"""
+        return (self.length - 1) * 10
+
+    def cells(self):
+        """Get the body cells, head first"""
+        mask = len(self.body) - 1
+        return [self.body[(self.head - i) & mask] for i in range(self.size)]
+
+    def positions(self):
+        """Get the body as pixel positions, like Snake.positions"""
+        return [((cell % GRID_WIDTH) * GRID_SIZE, (cell // GRID_WIDTH) * GRID_SIZE)
+                for cell in self.cells()]
+
+    def clone(self):
+        """Copy the state in O(1), the body is copied on first write
+
+        The copy starts with empty undo and redo history.
+        """
+        other = GameState.__new__(GameState)
+        other.body = self.body
+        other.head = self.head
+        other.size = self.size
+        other.length = self.length
+        other.occupied = self.occupied
+        other.food = self.food
+        other.direction = self.direction
+        other.alive = self.alive
+        other.key = self.key
+        other._owned = self._owned = False
+        other._undo = None
+        other._redo = None
+        return other
+
+    __copy__ = clone
+
+    def nbytes(self):
+        """Get the memory used by this state, not counting shared buffers"""
+        total = sys.getsizeof(self) + sys.getsizeof(self.occupied)
+        if self._owned:
+            total += sys.getsizeof(self.body)
+        for history in (self._undo, self._redo):
+            if history:
+                total += sys.getsizeof(history) + sum(
+                    sys.getsizeof(record) for record in history)
+        return total
+
+    def random_free_cell(self):
+        """Find a random cell the snake is not on"""
+        for _ in range(100):
+            cell = random.randrange(CELLS)
+            if not self.occupied >> cell & 1:
+                return cell
+        free = [cell for cell in range(CELLS) if not self.occupied >> cell & 1]
+        return random.choice(free) if free else NO_FOOD
+
+    def _own(self):
+        """Make a private copy of the body buffer before writing to it"""
+        if not self._owned:
+            self.body = array('H', self.body)
+            self._owned = True
+
+    def _push(self, cell):
+        """Add a new head, growing the ring buffer when it is full"""
+        capacity = len(self.body)
+        if self.size == capacity:
+            # Unroll the ring, tail first, into a buffer twice as big
+            cells = self.cells()
+            cells.reverse()
+            self.body = array('H', cells) * 2
+            self.head = self.size - 1
+            capacity *= 2
+        self.head = (self.head + 1) & (capacity - 1)
+        self.body[self.head] = cell
+        self.size += 1
+        self.occupied |= 1 << cell
+        self.key ^= BODY_KEYS[cell]
+
+    def _pop(self):
+        """Remove the tail and return its cell"""
+        cell = self.body[(self.head - self.size + 1) & (len(self.body) - 1)]
+        self.size -= 1
+        self.occupied &= ~(1 << cell)
+        self.key ^= BODY_KEYS[cell]
+        return cell
+
+    def _restore_tail(self, cell):
+        """Put a removed tail back"""
+        self.size += 1
+        self.body[(self.head - self.size + 1) & (len(self.body) - 1)] = cell
+        self.occupied |= 1 << cell
+        self.key ^= BODY_KEYS[cell]
+
+    def step(self, direction=None, _food=None):
+        """Turn, move and eat for one tick, return False on game over"""
+        if not self.alive:
+            return False
+        if self._undo is None:
+            self._undo = []
+        self._redo = None
+        return self._step(direction, _food)
+
+    def _step(self, direction, food):
+        """Apply one tick and record it for undo"""
+        old_direction = self.direction
+        old_food = self.food
+        old_head = self.body[self.head]
+
+        # Turn, preventing 180-degree turns like Snake.turn
+        if direction is not None:
+            index = DIRECTIONS.index(direction)
+            if self.length == 1 or index ^ 1 != self.direction:
+                self.key ^= DIRECTION_KEYS[self.direction] ^ DIRECTION_KEYS[index]
+                self.direction = index
+
+        # Check if snake hits itself (the tail counts, like Snake.move)
+        new = move_cell(old_head, DIRECTIONS[self.direction])
+        if self.occupied >> new & 1:
+            self.alive = False
+            self._undo.append((direction, old_direction, old_food, None, -1))
+            return False
+
+        self._own()
+        tail = self._pop() if self.size >= self.length else -1
+        self._push(new)
+        self.key ^= HEAD_KEYS[old_head] ^ HEAD_KEYS[new]
+
+        # Check if snake eats food
+        if new == self.food:
+            self.length += 1
+            self.food = self.random_free_cell() if food is None else food
+            self.key ^= FOOD_KEYS[old_food] ^ FOOD_KEYS[self.food]
+
+        self._undo.append((direction, old_direction, old_food, old_head, tail))
+        return True
+
+    def undo(self):
+        """Take back the last step, return False if there is none"""
+        if not self._undo:
+            return False
+        direction, old_direction, old_food, old_head, tail = self._undo.pop()
+        new_food = self.food
+
+        if old_head is not None:
+            self._own()
+            new = self.body[self.head]
+            self.size -= 1
+            self.head = (self.head - 1) & (len(self.body) - 1)
+            self.occupied &= ~(1 << new)
+            self.key ^= BODY_KEYS[new] ^ HEAD_KEYS[new] ^ HEAD_KEYS[old_head]
+            if tail >= 0:
+                self._restore_tail(tail)
+            if new == old_food:
+                self.length -= 1
+
+        self.key ^= (FOOD_KEYS[self.food] ^ FOOD_KEYS[old_food]
+                     ^ DIRECTION_KEYS[self.direction]
+                     ^ DIRECTION_KEYS[old_direction])
+        self.food = old_food
+        self.direction = old_direction
+        self.alive = True
+
+        if self._redo is None:
+            self._redo = []
+        self._redo.append((direction, new_food))
+        return True
+
+    def redo(self):
+        """Repeat the last undone step, return False if there is none"""
+        if not self._redo:
+            return False
+        direction, food = self._redo.pop()
+        self._step(direction, food)
+        return True
+
+    def __hash__(self):
+        return self.key
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return (self.key == other.key
+                and self.length == other.length
+                and self.direction == other.direction
+                and self.food == other.food
+                and self.alive == other.alive
+                and self.cells() == other.cells())
+
+
+# ========== BENCHMARK ==========
+class ListState:
+    """The game's own representation: a list of pixel tuples, like Snake"""
+
+    def __init__(self, state):
+        self.length = state.length
+        self.positions = state.positions()
+        self.direction = DIRECTIONS[state.direction]
+        self.food = ((state.food % GRID_WIDTH) * GRID_SIZE,
+                     (state.food // GRID_WIDTH) * GRID_SIZE)
+
+    def clone(self):
+        """Copy the state, sharing the position tuples"""
+        other = ListState.__new__(ListState)
+        other.length = self.length
+        other.positions = list(self.positions)
+        other.direction = self.direction
+        other.food = self.food
+        return other
+
+    def move(self, direction):
+        """Turn and move, like Snake.turn and Snake.move"""
+        if not (self.length > 1
+                and (direction[0] * -1, direction[1] * -1) == self.direction):
+            self.direction = direction
+        cur = self.positions[0]
+        x, y = self.direction
+        new = (((cur[0] + (x * GRID_SIZE)) % SCREEN_WIDTH),
+               (cur[1] + (y * GRID_SIZE)) % SCREEN_HEIGHT)
+        if len(self.positions) > 2 and new in self.positions[2:]:
+            return False
+        self.positions.insert(0, new)
+        if len(self.positions) > self.length:
+            self.positions.pop()
+        return True
+
+    def nbytes(self):
+        """Get the memory used by this state, not counting shared tuples"""
+        head = self.positions[0]
+        return (sys.getsizeof(self) + sys.getsizeof(self.__dict__)
+                + sys.getsizeof(self.positions)
+                + sys.getsizeof(head) + sum(map(sys.getsizeof, head)))
+
+
+def serpentine(length):
+    """Build a snake of the given length winding down the board row by row"""
+    path = [y * GRID_WIDTH + (x if y % 2 == 0 else GRID_WIDTH - 1 - x)
+            for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)][:length]
+    direction = RIGHT if (length - 1) // GRID_WIDTH % 2 == 0 else LEFT
+    state = GameState(path[0], direction, NO_FOOD)
+    for cell in path[1:]:
+        state._push(cell)
+    state.length = length
+    state.food = state.random_free_cell()
+    state.key ^= (HEAD_KEYS[path[0]] ^ HEAD_KEYS[path[-1]]
+                  ^ FOOD_KEYS[NO_FOOD] ^ FOOD_KEYS[state.food])
+    return state
+
+
+def timed(function, rounds):
+    """Get microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def benchmark():
+    """Compare clone speed and memory against the game's list of tuples"""
+    rounds = 20000
+    print(f'{"length":>6}  {"state":<8} {"clone us":>9} {"clone+step us":>14} '
+          f'{"bytes/state":>12}')
+    for length in (1, 10, 100, 500):
+        state = serpentine(length)
+        listed = ListState(state)
+        head = state.body[state.head]
+        move = next(d for d in DIRECTIONS
+                    if not state.occupied >> move_cell(head, d) & 1)
+
+        def clone_step():
+            child = state.clone()
+            child.step(move)
+            return child
+
+        def list_clone_step():
+            child = listed.clone()
+            child.move(move)
+            return child
+
+        for name, original, stepped in (
+                ('compact', state, clone_step),
+                ('list', listed, list_clone_step)):
+            print(f'{length if name == "compact" else "":>6}  {name:<8} '
+                  f'{timed(original.clone, rounds):>9.2f} '
+                  f'{timed(stepped, rounds):>14.2f} '
+                  f'{stepped().nbytes():>12}')
+
+
+# ========== RUN BENCHMARK ==========
+if __name__ == '__main__':
+    benchmark()